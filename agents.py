@@ -3,7 +3,7 @@ uAgents multi-agent system for content analysis
 """
 from uagents import Agent, Context, Protocol, Bureau
 from uagents.setup import fund_agent_if_low
-from models import TextMessage, PostMessage, ChatMessage, ChatResponse, BiasResponse, ReadabilityResponse
+from models import TextMessage, PostMessage, ChatMessage, ChatResponse, BiasResponse, ReadabilityResponse, SentimentResponse, TextFeatures
 from metta_engine import analyze_bias_metta
 from asi_one_client import get_comprehensive_analysis
 from scoring_engine import calculate_readability, calculate_overall_score
@@ -28,8 +28,11 @@ async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
                 content = text_to_analyze
             
             # Perform comprehensive analysis
-            bias_result = await analyze_bias_metta(content)
-            read_result = calculate_readability(content)
+            features = TextFeatures.from_text(content)
+            bias_result, read_result = await asyncio.gather(
+                analyze_bias_metta(features),
+                asyncio.to_thread(calculate_readability, features)
+            )
             
             # Calculate overall score (includes ASI:One comprehensive analysis)
             overall_score, score_breakdown, recommendations = await calculate_overall_score(
@@ -37,8 +40,8 @@ async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
                 bias_score=bias_result.biasDetectionScore,
                 readability_fk=read_result.readabilityFleschKincaid,
                 originality_score=0.0,  # Will be overridden by ASI analysis
-                similarity_score=0.0,  # Will be overridden by ASI analysis
-                text=content
+                plagiarism_score=0.0,  # Will be overridden by ASI analysis
+                features=features
             )
             
             # Extract information from comprehensive analysis
@@ -86,7 +89,6 @@ async def handle_chat_message(ctx: Context, sender: str, msg: ChatMessage):
 # --- Individual Analysis Agents ---
 
 # 1. BiasAgent - Uses MeTTa for reasoning
-bias_agent = Agent(name="BiasAgent", seed="bias_seed")
 bias_proto = Protocol("BiasCheck")
 
 @bias_proto.on_message(model=TextMessage)
@@ -96,34 +98,27 @@ async def check_bias(ctx: Context, sender: str, payload: TextMessage):
     
     try:
         # Use MeTTa to analyze bias
-        result = await analyze_bias_metta(post_text)
-        await ctx.send(sender, result.dict())
+        result = await analyze_bias_metta(TextFeatures.from_text(post_text))
+        await ctx.send(sender, result)
     except Exception as e:
         ctx.logger.error(f"Bias analysis failed: {e}")
         # Fallback response
-        await ctx.send(sender, {
-            "biasDetectionScore": 0.0,
-            "biasDetectionDirection": "neutral",
-            "matchedWords": []
-        })
-
-bias_agent.include(bias_proto)
+        await ctx.send(sender, BiasResponse(
+            biasDetectionScore=0.0,
+            biasDetectionDirection="neutral",
+            matchedWords=[]
+        ))
 
 # 2. ReadabilityAgent
-read_agent = Agent(name="ReadabilityAgent", seed="read_seed")
 read_proto = Protocol("ReadabilityCheck")
 
 @read_proto.on_message(model=TextMessage)
 async def readability(ctx: Context, sender: str, payload: TextMessage):
     """Calculate readability metrics"""
-    text = payload.text
-    result = calculate_readability(text)
-    await ctx.send(sender, result.dict())
-
-read_agent.include(read_proto)
+    result = calculate_readability(TextFeatures.from_text(payload.text))
+    await ctx.send(sender, result)
 
 # 3. SentimentAgent - Uses ASI:One for real NLP
-sentiment_agent = Agent(name="SentimentAgent", seed="sentiment_seed")
 sentiment_proto = Protocol("SentimentCheck")
 
 @sentiment_proto.on_message(model=TextMessage)
@@ -133,80 +128,92 @@ async def check_sentiment(ctx: Context, sender: str, payload: TextMessage):
     
     try:
         # Use ASI:One comprehensive analysis
-        asi_analysis = await get_comprehensive_analysis(post_text)
+        asi_analysis = await get_comprehensive_analysis(TextFeatures.from_text(post_text))
         sentiment_score = asi_analysis["sentiment"]
         main_topic = asi_analysis["main_topic"]
         secondary_topics = asi_analysis["secondary_topics"]
-        similarity = asi_analysis["similarity"]
+        similarity = asi_analysis["plagiarism"]
         
-        await ctx.send(sender, {
-            "sentimentScore": sentiment_score,
-            "mainTopic": main_topic,
-            "secondaryTopics": secondary_topics,
-            "similarityScore": similarity,
-            "originalityScore": 1 - similarity
-        })
+        await ctx.send(sender, SentimentResponse(
+            sentimentScore=sentiment_score,
+            mainTopic=main_topic,
+            secondaryTopics=secondary_topics,
+            similarityScore=similarity,
+            originalityScore=1 - similarity
+        ))
     except Exception as e:
         ctx.logger.error(f"Sentiment analysis failed: {e}")
         # Fallback response
-        await ctx.send(sender, {
-            "sentimentScore": 0.0,
-            "mainTopic": "General",
-            "secondaryTopics": ["AI"],
-            "similarityScore": 0.3,
-            "originalityScore": 0.7
-        })
-
-sentiment_agent.include(sentiment_proto)
+        await ctx.send(sender, SentimentResponse(
+            sentimentScore=0.0,
+            mainTopic="General",
+            secondaryTopics=["AI"],
+            similarityScore=0.3,
+            originalityScore=0.7
+        ))
 
 # 4. AggregatorAgent - Main agent with Chat Protocol
-agg_agent = Agent(name="AggregatorAgent", seed="agg_seed")
 agg_proto = Protocol("PostRating")
 
-# Add Chat Protocol to AggregatorAgent
-agg_agent.include(chat_protocol)
-
 @agg_proto.on_message(model=PostMessage)
 async def aggregate(ctx: Context, sender: str, payload: PostMessage):
     """Aggregate results from all agents"""
     post_uuid = payload.postUuid
     post_text = payload.text
 
-    # --- Communicate with sub-agents using real uAgents ---
-    bias_result = await agg_agent.send("BiasAgent", "BiasCheck", TextMessage(text=post_text))
-    read_result = await agg_agent.send("ReadabilityAgent", "ReadabilityCheck", TextMessage(text=post_text))
-    sentiment_result = await agg_agent.send("SentimentAgent", "SentimentCheck", TextMessage(text=post_text))
-
-    # --- Use real agent results ---
-    sentiment_score = sentiment_result["sentimentScore"]
-    similarity = sentiment_result["similarityScore"]
-    originality = sentiment_result["originalityScore"]
-    main_topic = sentiment_result["mainTopic"]
-    secondary_topics = sentiment_result["secondaryTopics"]
+    # --- Run the analyses in-process; routing through the sub-agents only adds hops ---
+    features = TextFeatures.from_text(post_text)
+    bias_result, read_result, asi_analysis = await asyncio.gather(
+        analyze_bias_metta(features),
+        asyncio.to_thread(calculate_readability, features),
+        get_comprehensive_analysis(features)
+    )
+
+    # --- Use real analysis results ---
+    sentiment_score = asi_analysis["sentiment"]
+    similarity = asi_analysis["plagiarism"]
+    originality = 1 - similarity
+    main_topic = asi_analysis["main_topic"]
+    secondary_topics = asi_analysis["secondary_topics"]
     
     # Calculate overall rating using real data
-    rating = int((sentiment_score + (1 - bias_result["biasDetectionScore"]) + originality + (read_result["readabilityFleschKincaid"]/100)) * 25)
+    rating = int((sentiment_score + (1 - bias_result.biasDetectionScore) + originality + (read_result.readabilityFleschKincaid/100)) * 25)
 
     # --- Return result ---
     return {
         "rating": rating,
         "sentimentAnalysisScore": sentiment_score,
-        "biasDetectionScore": bias_result["biasDetectionScore"],
-        "biasDetectionDirection": bias_result["biasDetectionDirection"],
+        "biasDetectionScore": bias_result.biasDetectionScore,
+        "biasDetectionDirection": bias_result.biasDetectionDirection,
         "originalityScore": originality,
         "similarityScore": similarity,
-        "readabilityFleschKincaid": read_result["readabilityFleschKincaid"],
-        "readabilityGunningFog": read_result["readabilityGunningFog"],
+        "readabilityFleschKincaid": read_result.readabilityFleschKincaid,
+        "readabilityGunningFog": read_result.readabilityGunningFog,
         "mainTopic": main_topic,
         "secondaryTopics": secondary_topics,
         "explanation": [bias_result, read_result]
     }
 
-agg_agent.include(agg_proto)
-
 # --- Bureau for Agent Orchestration ---
-bureau = Bureau()
-bureau.add(bias_agent)
-bureau.add(read_agent)
-bureau.add(sentiment_agent)
-bureau.add(agg_agent)
\ No newline at end of file
+def build_bureau(loop=None) -> Bureau:
+    """Create the agents and a Bureau running them, bound to loop (the current event loop by default)"""
+    bias_agent = Agent(name="BiasAgent", seed="bias_seed")
+    bias_agent.include(bias_proto)
+    
+    read_agent = Agent(name="ReadabilityAgent", seed="read_seed")
+    read_agent.include(read_proto)
+    
+    sentiment_agent = Agent(name="SentimentAgent", seed="sentiment_seed")
+    sentiment_agent.include(sentiment_proto)
+    
+    # AggregatorAgent also serves the Chat Protocol
+    agg_agent = Agent(name="AggregatorAgent", seed="agg_seed")
+    agg_agent.include(chat_protocol)
+    agg_agent.include(agg_proto)
+    
+    bureau = Bureau(loop=loop)
+    bureau.add(bias_agent)
+    bureau.add(read_agent)
+    bureau.add(sentiment_agent)
+    bureau.add(agg_agent)
+    return bureau
@@ -3,14 +3,19 @@ FastAPI application with single /analyze/post endpoint
 """
 from fastapi import FastAPI, HTTPException, APIRouter
 from datetime import datetime
+import asyncio
 import uuid
-from models import PostAnalysisRequest, PostAnalysisResponse
+from models import PostAnalysisRequest, PostAnalysisResponse, TextFeatures
 from scoring_engine import calculate_readability, calculate_overall_score
 from asi_one_client import get_comprehensive_analysis
-from metta_engine import analyze_bias_metta
 
 router = APIRouter()
 
+def load_metta_engine():
+    """Import the MeTTa engine, building its knowledge base on first use"""
+    from metta_engine import analyze_bias_metta
+    return analyze_bias_metta
+
 @router.post("/analyze/post", response_model=PostAnalysisResponse)
 async def analyze_post(request: PostAnalysisRequest):
     """Complete post analysis using Fetch.ai ASI-based scoring system"""
@@ -18,14 +23,18 @@ async def analyze_post(request: PostAnalysisRequest):
         # Generate UUID if not provided
         post_uuid = request.postUuid or str(uuid.uuid4())
         
-        # Get comprehensive analysis from ASI
-        asi_analysis = await get_comprehensive_analysis(request.text)
+        # Already loaded by the startup hook; this only looks up sys.modules
+        analyze_bias_metta = load_metta_engine()
         
-        # Get bias analysis from MeTTa engine
-        bias_result = await analyze_bias_metta(request.text)
+        # Tokenize once and share the result with every analysis
+        features = TextFeatures.from_text(request.text)
         
-        # Get readability analysis
-        read_result = calculate_readability(request.text)
+        # Run ASI analysis, MeTTa bias analysis and readability concurrently
+        asi_analysis, bias_result, read_result = await asyncio.gather(
+            get_comprehensive_analysis(features),
+            analyze_bias_metta(features),
+            asyncio.to_thread(calculate_readability, features)
+        )
         
         # Calculate overall score using ASI engine
         overall_score, score_breakdown, recommendations = await calculate_overall_score(
@@ -34,7 +43,7 @@ async def analyze_post(request: PostAnalysisRequest):
             readability_fk=read_result.readabilityFleschKincaid,
             originality_score=1.0 - asi_analysis.get("plagiarism", 0.5),  # Convert plagiarism to originality
             plagiarism_score=asi_analysis.get("plagiarism", 0.5),
-            text=request.text
+            features=features
         )
         
         # Extract scores
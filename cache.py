@@ -0,0 +1,143 @@
+"""
+Two-tier result cache for ASI:One content analysis: a process-local LRU in front of Redis
+(the LRU and SQLite stores are also used by the Ollama client)
+"""
+import os
+import time
+import sqlite3
+import threading
+import orjson
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    # redis not installed, analyses are always computed
+    redis = None
+
+logger = logging.getLogger("asi_one.cache")
+
+# Cache configuration (caching is disabled unless REDIS_URL is set)
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "3600"))
+LOCAL_CACHE_SIZE = int(os.getenv("ANALYSIS_LOCAL_CACHE_SIZE", "1024"))
+# Bump the version whenever the ASI:One prompt or post-processing changes
+CACHE_VERSION = "v4"
+CACHE_PREFIX = f"asi:analysis:{CACHE_VERSION}:"
+
+_redis = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5) if redis and REDIS_URL else None
+
+
+class LRUCache:
+    """Bounded least-recently-used cache whose entries expire after ttl seconds; safe to share with worker threads"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache:
+    """Persistent cache of JSON-serializable values in a local SQLite file; entries expire after ttl seconds"""
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets readers in other processes proceed while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL, value BLOB)")
+        self._db.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute("SELECT expires, value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        return orjson.loads(row[1])
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (key, time.time() + self.ttl, orjson.dumps(value))
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# Process-local tier: serves repeats in burst traffic without a Redis round trip
+_local = LRUCache(LOCAL_CACHE_SIZE, CACHE_TTL)
+
+
+def cache_key(text: str) -> str:
+    """Truncated SHA-256 of the normalized text"""
+    return hashlib.sha256(text.strip().lower().encode()).hexdigest()[:32]
+
+
+async def get_or_compute(text: str, compute_fn: Callable[[str], Awaitable[dict]]) -> dict:
+    """Return the cached analysis for text, computing and storing it on a miss"""
+    key = CACHE_PREFIX + cache_key(text)
+
+    result = _local.get(key)
+    if result is not None:
+        return result
+
+    if _redis is not None:
+        try:
+            cached = await _redis.get(key)
+            if cached is not None:
+                result = orjson.loads(cached)
+                _local.set(key, result)
+                return result
+        except Exception as e:
+            logger.warning("⚠️  Redis cache read failed: %s", e)
+
+    result = await compute_fn(text)
+    _local.set(key, result)
+
+    if _redis is not None:
+        try:
+            await _redis.setex(key, CACHE_TTL, orjson.dumps(result))
+        except Exception as e:
+            logger.warning("⚠️  Redis cache write failed: %s", e)
+
+    return result
+
+
+async def aclose():
+    """Close the Redis connection pool"""
+    if _redis is not None:
+        await _redis.aclose()
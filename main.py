@@ -1,19 +1,59 @@
 """
 Main application entry point
 """
+import os
+import asyncio
+import logging
 import uvicorn
-from api import router
+from api import router, load_metta_engine
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from asi_one_client import aclose as close_asi_client
+from openai_client import aclose as close_ollama_client
+from cache import aclose as close_cache
+
+logging.basicConfig(level=logging.INFO)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Fetch.ai ASI Content Analysis Agent",
     description="AI-powered content analysis using Fetch.ai ASI",
-    version="2.0.0"
+    version="2.0.0",
+    # Responses (score breakdowns included) are serialized with orjson
+    default_response_class=ORJSONResponse
 )
 
 app.include_router(router)
 
+# The uAgents Bureau is only needed when agents are served alongside the API
+ENABLE_BUREAU = os.getenv("ENABLE_BUREAU", "0") == "1"
+bureau_task = None
+
+@app.on_event("startup")
+async def startup():
+    """Build the MeTTa knowledge base and start the uAgents Bureau when enabled"""
+    global bureau_task
+    await asyncio.to_thread(load_metta_engine)
+    if not ENABLE_BUREAU:
+        return
+    
+    # Run the Bureau on the FastAPI event loop so agent dispatch stays on one loop
+    from agents import build_bureau
+    bureau = build_bureau(asyncio.get_running_loop())
+    bureau_task = asyncio.create_task(bureau.run_async())
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled ASI:One, Ollama and Redis connections and stop the Bureau"""
+    await close_asi_client()
+    await close_ollama_client()
+    await close_cache()
+    
+    # Not awaited: the Bureau's own shutdown cancels every other task on the loop,
+    # including this lifespan handler, so let it finish as the loop winds down
+    if bureau_task is not None:
+        bureau_task.cancel()
+
 if __name__ == "__main__":
     print("🚀 Starting Fetch.ai ASI Content Analysis API...")
     print("📚 API Documentation: http://localhost:8001/docs")
@@ -21,4 +61,4 @@ if __name__ == "__main__":
     print("🤖 Powered by Fetch.ai ASI...")
     
     # Start FastAPI server
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(app, host="0.0.0.0", port=8001, loop="uvloop", http="httptools")
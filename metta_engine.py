@@ -1,8 +1,16 @@
 """
 MeTTa reasoning engine for bias detection and content analysis
 """
+import re
+from functools import lru_cache
 from hyperon import MeTTa
-from models import BiasResponse
+from models import BiasResponse, TextFeatures
+
+try:
+    import ahocorasick
+except ImportError:
+    # pyahocorasick not installed, phrases are matched with one substring scan each
+    ahocorasick = None
 
 # Initialize MeTTa runtime
 metta = MeTTa()
@@ -27,92 +35,129 @@ profanity_words = [
     "nigger", "faggot", "retard", "idiot", "moron", "stupid"
 ]
 
-def initialize_metta_rules():
-    """Initialize MeTTa knowledge base with bias detection rules"""
-    # Add atoms to MeTTa knowledge base
-    for word in extreme_words:
-        metta.run(f'!(add-atom (extreme-word "{word}" 0.9))')
+manipulation_phrases = ["you must", "everyone knows", "obviously", "clearly", "without a doubt"]
+
+absolute_claims = ["100%", "guaranteed", "proven", "scientific fact", "definitely"]
+
+# (pattern, score) in scoring order; a pattern counts once however often it appears
+bias_patterns = (
+    [(word.lower(), 0.9) for word in extreme_words] +  # High bias score for extreme words
+    [(word.lower(), 0.7) for word in polarizing_words] +  # Medium bias score for polarizing words
+    [(word.lower(), 0.8) for word in profanity_words] +  # High bias score for profanity
+    [(phrase, 0.6) for phrase in manipulation_phrases] +
+    [(claim, 0.8) for claim in absolute_claims]
+)
+
+# Keywords match whole tokens ("hell" must not match "hello"); phrases and claims match anywhere
+_WORD_PATTERNS = len(extreme_words) + len(polarizing_words) + len(profanity_words)
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+def _pattern_indices(patterns):
+    """Map each pattern to its indices in bias_patterns"""
+    indices = {}
+    for i, (pattern, _) in patterns:
+        indices.setdefault(pattern, []).append(i)
+    return {pattern: tuple(pattern_indices) for pattern, pattern_indices in indices.items()}
 
-    for word in polarizing_words:
-        metta.run(f'!(add-atom (polarizing-word "{word}" 0.7))')
+# Text shorter than every pattern cannot match any of them
+_MIN_PATTERN_LEN = min(len(pattern) for pattern, _ in bias_patterns)
 
-    for word in profanity_words:
-        metta.run(f'!(add-atom (profanity-word "{word}" 0.8))')
+_word_indices = _pattern_indices(list(enumerate(bias_patterns))[:_WORD_PATTERNS])
+_bias_words = frozenset(_word_indices)
+_phrase_indices = _pattern_indices(list(enumerate(bias_patterns))[_WORD_PATTERNS:])
+
+def _build_automaton():
+    """Aho-Corasick automaton over the phrase and claim patterns"""
+    automaton = ahocorasick.Automaton()
+    for pattern, pattern_indices in _phrase_indices.items():
+        automaton.add_word(pattern, pattern_indices)
+    automaton.make_automaton()
+    return automaton
+
+_automaton = _build_automaton() if ahocorasick else None
+
+def match_bias_patterns(lower: str) -> list:
+    """Indices into bias_patterns of every pattern found in the lowercased text, in scoring order"""
+    hits = set()
+    for word in _bias_words.intersection(_TOKEN_RE.findall(lower)):
+        hits.update(_word_indices[word])
+    
+    if _automaton is None:
+        for phrase, pattern_indices in _phrase_indices.items():
+            if phrase in lower:
+                hits.update(pattern_indices)
+    else:
+        # One pass over the text instead of one substring scan per phrase
+        for _, pattern_indices in _automaton.iter(lower):
+            hits.update(pattern_indices)
+    return sorted(hits)
+
+def initialize_metta_rules():
+    """Initialize MeTTa knowledge base with bias detection rules"""
+    # Word categories as plain facts; a program's top-level atoms are added to &self
+    facts = (
+        [f'(extreme-word "{word}" 0.9)' for word in extreme_words] +
+        [f'(polarizing-word "{word}" 0.7)' for word in polarizing_words] +
+        [f'(profanity-word "{word}" 0.8)' for word in profanity_words]
+    )
 
     # Define reasoning rules
-    metta.run('''
-    !(add-atom (rule-bias 
+    rules = '''
+    (rule-bias 
       (if (and (contains-word $post $word) (extreme-word $word $score))
-          (set-bias-score $post $score))))
-    ''')
+          (set-bias-score $post $score)))
 
-    metta.run('''
-    !(add-atom (rule-bias 
+    (rule-bias 
       (if (and (contains-word $post $word) (polarizing-word $word $score))
-          (set-bias-score $post $score))))
-    ''')
+          (set-bias-score $post $score)))
 
-    # Fact-checking rules
-    metta.run('''
-    !(add-atom (rule-fact-check
+    ; Fact-checking rules
+    (rule-fact-check
       (if (contains-claim $post "100%" "guaranteed" "proven" "scientific fact")
-          (flag-uncertainty $post 0.8))))
-    ''')
+          (flag-uncertainty $post 0.8)))
 
-    # Emotional manipulation detection
-    metta.run('''
-    !(add-atom (rule-emotional-manipulation
+    ; Emotional manipulation detection
+    (rule-emotional-manipulation
       (if (contains-phrase $post "you must" "everyone knows" "obviously" "clearly")
-          (set-manipulation-score $post 0.6))))
-    ''')
+          (set-manipulation-score $post 0.6)))
+    '''
+
+    # Load the whole knowledge base with a single parser/evaluator pass
+    metta.run("\n".join(facts) + rules)
 
     print("🧠 MeTTa reasoning engine initialized with sophisticated bias detection rules")
 
-async def analyze_bias_metta(text: str) -> BiasResponse:
+async def analyze_bias_metta(features: TextFeatures) -> BiasResponse:
     """Analyze text for bias using MeTTa reasoning engine"""
+    if len(features.lower) < _MIN_PATTERN_LEN:
+        return BiasResponse(
+            biasDetectionScore=0.0,
+            biasDetectionDirection="neutral",
+            matchedWords=[]
+        )
+    
+    # Run inline: a scan takes well under a millisecond, less than a thread hop
+    return _analyze_bias_sync(features)
+
+# Bias analysis is a pure function of the text; reposted content skips the whole scan
+@lru_cache(maxsize=4096)
+def _analyze_bias_sync(features: TextFeatures) -> BiasResponse:
+    """Score the bias keywords, phrases and claims found in the text"""
+    text = features.text
+    lower = features.lower
     try:
         print(f"🔍 Running MeTTa bias analysis on: {text[:50]}...")
         
-        # Use MeTTa to analyze the text for bias
-        result = metta.run(f'!(analyze-bias "{text}")')
-        print(f"✅ MeTTa bias result: {result}")
-        
         # Extract bias score using MeTTa's knowledge base
         bias_score = 0.0
         matched_words = []
         direction = "neutral"
         
-        # Check for extreme words
-        for word in extreme_words:
-            if word.lower() in text.lower():
-                bias_score += 0.9  # High bias score for extreme words
-                matched_words.append(word)
-        
-        # Check for polarizing words
-        for word in polarizing_words:
-            if word.lower() in text.lower():
-                bias_score += 0.7  # Medium bias score for polarizing words
-                matched_words.append(word)
-        
-        # Check for profanity words
-        for word in profanity_words:
-            if word.lower() in text.lower():
-                bias_score += 0.8  # High bias score for profanity
-                matched_words.append(word)
-        
-        # Check for emotional manipulation phrases
-        manipulation_phrases = ["you must", "everyone knows", "obviously", "clearly", "without a doubt"]
-        for phrase in manipulation_phrases:
-            if phrase in text.lower():
-                bias_score += 0.6
-                matched_words.append(phrase)
-        
-        # Check for absolute claims
-        absolute_claims = ["100%", "guaranteed", "proven", "scientific fact", "definitely"]
-        for claim in absolute_claims:
-            if claim in text.lower():
-                bias_score += 0.8
-                matched_words.append(claim)
+        # Score every extreme, polarizing, profane, manipulative or absolute pattern found
+        for i in match_bias_patterns(lower):
+            pattern, score = bias_patterns[i]
+            bias_score += score
+            matched_words.append(pattern)
         
         bias_score = min(bias_score, 1.0)
         print(f"✅ MeTTa bias score: {bias_score:.2f}, matched words: {matched_words}")
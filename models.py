@@ -1,8 +1,9 @@
 """
 Pydantic models for API requests and responses
 """
+from dataclasses import dataclass, field
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 # --- Core Message Models for uAgents ---
 class TextMessage(BaseModel):
@@ -31,6 +32,34 @@ class ReadabilityResponse(BaseModel):
     readabilityGunningFog: float
     readabilityScore: float  # Comprehensive 0-100 score
 
+class SentimentResponse(BaseModel):
+    sentimentScore: float
+    mainTopic: str
+    secondaryTopics: List[str]
+    similarityScore: float
+    originalityScore: float
+
+# --- Per-request text features, computed once and shared by every analysis ---
+# Equality and hashing use the text only, so features work as cheap memoization keys
+@dataclass(frozen=True)
+class TextFeatures:
+    text: str
+    lower: str = field(compare=False)
+    words: Tuple[str, ...] = field(compare=False)
+    word_count: int = field(compare=False)
+    char_count: int = field(compare=False)  # Non-whitespace characters
+
+    @classmethod
+    def from_text(cls, text: str) -> "TextFeatures":
+        words = tuple(text.split())
+        return cls(
+            text=text,
+            lower=text.lower(),
+            words=words,
+            word_count=len(words),
+            char_count=sum(len(w) for w in words)
+        )
+
 # --- Main API Request/Response Models ---
 class PostAnalysisRequest(BaseModel):
     text: str
@@ -2,10 +2,15 @@
 Ollama client for content analysis and scoring (FREE, LOCAL, UNLIMITED)
 """
 import os
-import json
+import asyncio
+import orjson
 import re
-from typing import Dict, List, Tuple
-from openai import OpenAI
+import httpx
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+from cache import LRUCache, SQLiteCache, cache_key, CACHE_TTL
+from semantic_cache import SemanticCache, SEMANTIC_CACHE_SIZE, SIMILARITY_THRESHOLD
 
 # Load environment variables from .env file if it exists
 try:
@@ -23,12 +28,32 @@ except Exception as e:
 ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
 ollama_model = os.getenv("OLLAMA_MODEL", "llama3.2")  # Default to llama3.2, can use: llama3.1, mistral, phi3, etc.
 
+# Request limits: the SDK retries 429s, timeouts and 5xx with exponential backoff; async requests are capped in flight
+OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "3"))
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "20"))
+# Seconds per request attempt, shared by both clients; the default matches the OpenAI SDK's, as local generations can be slow
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "600"))
+
 try:
     # Ollama is compatible with OpenAI API format, just change the base_url
     # No API key needed for local Ollama
     client = OpenAI(
         api_key="ollama",  # Dummy key, not used by local Ollama
-        base_url=ollama_base_url
+        base_url=ollama_base_url,
+        max_retries=OLLAMA_MAX_RETRIES,
+        timeout=OLLAMA_TIMEOUT
+    )
+    # Same server for async callers, so scoring never blocks the event loop on a completion;
+    # one pooled HTTP client keeps connections alive across every concurrent scoring
+    async_client = AsyncOpenAI(
+        api_key="ollama",
+        base_url=ollama_base_url,
+        max_retries=OLLAMA_MAX_RETRIES,
+        http_client=httpx.AsyncClient(
+            timeout=OLLAMA_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            http2=True
+        )
     )
     print(f"✅ Ollama client initialized successfully")
     print(f"   Using model: {ollama_model}")
@@ -40,29 +65,91 @@ except Exception as e:
     print("   💡 Start Ollama: ollama serve")
     print("   💡 Pull a model: ollama pull llama3.2")
     client = None
+    async_client = None
 
-def analyze_content_with_openai(text: str) -> Dict:
-    """
-    Comprehensive content analysis using Ollama (local LLM)
-    Returns sentiment, bias, readability, originality, and AI detection scores
-    """
-    if not text.strip():
-        return {
-            "sentiment": 0.0,
-            "bias": 0.0,
-            "readability": 50.0,
-            "originality": 0.5,
-            "plagiarism": 0.5,
-            "ai_detection": 0.5,
-            "main_topic": "General",
-            "secondary_topics": ["General"],
-            "reasoning": "Empty content provided"
-        }
-    
-    prompt = f"""
-Analyze the following text and provide a comprehensive content analysis. Return ONLY a valid JSON object with the following structure:
+# Semaphore capping in-flight async requests, bound to the event loop it was created on
+_request_slots: Optional[asyncio.Semaphore] = None
+_request_slots_loop: Optional[asyncio.AbstractEventLoop] = None
 
-{{
+def _slots() -> asyncio.Semaphore:
+    """The request semaphore for the running event loop, rebuilt when the loop changes"""
+    global _request_slots, _request_slots_loop
+    loop = asyncio.get_running_loop()
+    if _request_slots is None or _request_slots_loop is not loop:
+        _request_slots = asyncio.Semaphore(OLLAMA_MAX_CONCURRENCY)
+        _request_slots_loop = loop
+    return _request_slots
+
+async def aclose():
+    """Close the shared async Ollama client and its connection pool"""
+    if async_client is not None:
+        await async_client.close()
+
+# Successful analyses by text hash; readability and overall scoring of one post share a single call
+ANALYSIS_CACHE_SIZE = int(os.getenv("OLLAMA_CACHE_SIZE", "4096"))
+_analysis_cache = LRUCache(ANALYSIS_CACHE_SIZE, CACHE_TTL)
+
+# Optional persistent tier behind it: analyses survive restarts when OLLAMA_CACHE_DB names a SQLite file
+OLLAMA_CACHE_DB = os.getenv("OLLAMA_CACHE_DB")
+_disk_cache = SQLiteCache(OLLAMA_CACHE_DB, CACHE_TTL) if OLLAMA_CACHE_DB else None
+# Bump the version whenever the Ollama prompt or validation changes
+_CACHE_PREFIX = "ollama:analysis:v2:"
+
+def _analysis_key(text: str) -> str:
+    """Cache key of the analysis of text"""
+    return _CACHE_PREFIX + cache_key(text)
+
+def _disk_get(key: str) -> Optional[Dict]:
+    """Analysis from the persistent tier, or None on a miss or a failed read"""
+    try:
+        return _disk_cache.get(key)
+    except Exception as e:
+        print(f"⚠️  Analysis cache read failed: {e}")
+        return None
+
+def _disk_set(key: str, result: Dict):
+    """Write an analysis to the persistent tier, logging a failed write"""
+    try:
+        _disk_cache.set(key, result)
+    except Exception as e:
+        print(f"⚠️  Analysis cache write failed: {e}")
+
+def _cached_analysis(key: str) -> Optional[Dict]:
+    """Cached analysis from the in-process tier, then the persistent one"""
+    result = _analysis_cache.get(key)
+    if result is None and _disk_cache is not None:
+        result = _disk_get(key)
+        if result is not None:
+            _analysis_cache.set(key, result)
+    return result
+
+def _store_analysis(key: str, result: Dict):
+    """Cache an analysis in both tiers"""
+    _analysis_cache.set(key, result)
+    if _disk_cache is not None:
+        _disk_set(key, result)
+
+async def _cached_analysis_async(key: str) -> Optional[Dict]:
+    """Async _cached_analysis; the SQLite read runs in a worker thread so a slow disk never stalls the event loop"""
+    result = _analysis_cache.get(key)
+    if result is None and _disk_cache is not None:
+        result = await asyncio.to_thread(_disk_get, key)
+        if result is not None:
+            _analysis_cache.set(key, result)
+    return result
+
+async def _store_analysis_async(key: str, result: Dict):
+    """Async _store_analysis, writing the persistent tier from a worker thread"""
+    _analysis_cache.set(key, result)
+    if _disk_cache is not None:
+        await asyncio.to_thread(_disk_set, key, result)
+
+# Near-duplicate posts reuse a stored analysis; enabled by naming an Ollama embedding model, e.g. nomic-embed-text
+ollama_embed_model = os.getenv("OLLAMA_EMBED_MODEL")
+_semantic_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SIMILARITY_THRESHOLD) if ollama_embed_model else None
+
+# Prompt pieces shared by the single and batch prompts
+_RESPONSE_FORMAT = """{
   "sentiment": <number from -1.0 to 1.0>,
   "bias": <number from 0.0 to 1.0>,
   "readability": <number from 0 to 100>,
@@ -71,10 +158,13 @@ Analyze the following text and provide a comprehensive content analysis. Return
   "ai_detection": <number from 0.0 to 1.0>,
   "main_topic": "<string>",
   "secondary_topics": ["<string>", "<string>", "<string>"],
-  "reasoning": "<brief explanation of the analysis>"
-}}
+  "reasoning": "<one sentence of at most 25 words explaining the analysis>"
+}"""
 
-SCORING GUIDELINES:
+# Response budget per analyzed text; a full reply with a 25-word reasoning is ~150 tokens
+_MAX_TOKENS = 250
+
+_SCORING_GUIDELINES = """SCORING GUIDELINES:
 
 SENTIMENT (-1.0 to 1.0):
 - -1.0: Very negative, critical, pessimistic
@@ -107,10 +197,81 @@ AI DETECTION (0.0 to 1.0):
 - 0.0: Definitely human-written
 - 0.5: Unclear, could be either
 - 1.0: Definitely AI-generated
-
-Text to analyze: "{text}"
 """
 
+# Prompt template split around the text once; only the text varies per call
+_PROMPT_PREFIX = (
+    "\nAnalyze the following text and provide a comprehensive content analysis. "
+    "Return ONLY a valid JSON object with the following structure:\n\n"
+    + _RESPONSE_FORMAT + "\n\n" + _SCORING_GUIDELINES + '\nText to analyze: "'
+)
+_PROMPT_SUFFIX = '"\n'
+
+# Batch prompt; the texts follow as a JSON array of {"id", "text"} objects
+_BATCH_PROMPT_PREFIX = (
+    "\nAnalyze each of the following texts and provide a comprehensive content analysis of each. "
+    "Return ONLY a valid JSON array with one object per text, in the same order, each with the text's "
+    '"id" and the following structure:\n\n'
+    + _RESPONSE_FORMAT + "\n\n" + _SCORING_GUIDELINES + "\nTexts to analyze:\n"
+)
+_SYSTEM_MSG = {"role": "system", "content": "You are an expert content analyst. Analyze text and provide accurate scores. Always return valid JSON only."}
+
+# Numeric score fields with their defaults and valid ranges, clamped in one vector op
+_SCORE_FIELDS = (
+    ("sentiment", 0.0),
+    ("bias", 0.5),
+    ("readability", 50.0),
+    ("originality", 0.5),
+    ("plagiarism", 0.5),
+    ("ai_detection", 0.5),
+)
+_SCORE_KEYS = tuple(key for key, _ in _SCORE_FIELDS)
+_SCORE_LOWS = np.array([-1.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+_SCORE_HIGHS = np.array([1.0, 1.0, 100.0, 1.0, 1.0, 1.0])
+
+def is_effectively_empty(text: str) -> bool:
+    """True for empty or whitespace-only text; unlike text.strip(), never copies the text"""
+    return not text or text.isspace()
+
+def _reply_json(response) -> str:
+    """JSON text of a chat completion reply, without any markdown code fence"""
+    content = response.choices[0].message.content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return content
+
+def _validate_analysis(result: Dict) -> Dict:
+    """Clamp the scores of a parsed analysis to their ranges and coerce the text fields"""
+    scores = np.array([float(result.get(key, default)) for key, default in _SCORE_FIELDS], dtype=np.float64)
+    np.clip(scores, _SCORE_LOWS, _SCORE_HIGHS, out=scores)
+    result.update(zip(_SCORE_KEYS, scores.tolist()))
+    result["main_topic"] = str(result.get("main_topic", "General"))
+    result["secondary_topics"] = list(result.get("secondary_topics", ["General"]))
+    result["reasoning"] = str(result.get("reasoning", "Analysis completed"))
+    return result
+
+def analyze_content_with_openai(text: str) -> Dict:
+    """
+    Comprehensive content analysis using Ollama (local LLM)
+    Returns sentiment, bias, readability, originality, and AI detection scores
+    """
+    if is_effectively_empty(text):
+        return {
+            "sentiment": 0.0,
+            "bias": 0.0,
+            "readability": 50.0,
+            "originality": 0.5,
+            "plagiarism": 0.5,
+            "ai_detection": 0.5,
+            "main_topic": "General",
+            "secondary_topics": ["General"],
+            "reasoning": "Empty content provided"
+        }
+    
+    prompt = _PROMPT_PREFIX + text + _PROMPT_SUFFIX
+
     if not client:
         print("❌ Ollama client not initialized. Please make sure Ollama is running.")
         print("   Install: https://ollama.ai/download")
@@ -128,64 +289,147 @@ Text to analyze: "{text}"
             "reasoning": "Ollama not running or not configured"
         }
     
+    try:
+        response = client.chat.completions.create(**_completion_args(prompt))
+        return _accept_analysis(text, response)
+    except Exception as e:
+        return _failed_analysis(e)
+
+async def analyze_content_with_openai_async(text: str) -> Dict:
+    """Async analyze_content_with_openai: awaits the completion instead of blocking the event loop"""
+    if is_effectively_empty(text) or not async_client:
+        # Empty text or no server configured: the fallback result needs no request
+        return analyze_content_with_openai(text)
+    
+    try:
+        async with _slots():
+            response = await async_client.chat.completions.create(**_completion_args(_PROMPT_PREFIX + text + _PROMPT_SUFFIX))
+        result = _parse_analysis(response)
+    except Exception as e:
+        return _failed_analysis(e)
+    # Only real analyses are cached; fallbacks are retried on the next call
+    await _store_analysis_async(_analysis_key(text), result)
+    return result
+
+def _completion_args(prompt: str) -> Dict:
+    """Chat completion arguments for a single-text analysis prompt"""
+    return {
+        "model": ollama_model,
+        "messages": [_SYSTEM_MSG, {"role": "user", "content": prompt}],
+        "temperature": 0.3,
+        "max_tokens": _MAX_TOKENS,
+        # JSON mode: the server constrains decoding to a single JSON object, so replies always parse
+        "response_format": {"type": "json_object"}
+    }
+
+def _parse_analysis(response) -> Dict:
+    """Parsed and validated analysis from a single-text completion"""
+    return _validate_analysis(orjson.loads(_reply_json(response)))
+
+def _accept_analysis(text: str, response) -> Dict:
+    """Parse and validate a completion for text, caching the result"""
+    result = _parse_analysis(response)
+    # Only real analyses are cached; fallbacks are retried on the next call
+    _store_analysis(_analysis_key(text), result)
+    return result
+
+def _failed_analysis(e: Exception) -> Dict:
+    """Default analysis returned when the Ollama request or its parsing fails"""
+    print(f"❌ Ollama analysis error: {e}")
+    print("   💡 Make sure Ollama is running: ollama serve")
+    print(f"   💡 Make sure model is pulled: ollama pull {ollama_model}")
+    # Return default values on error
+    return {
+        "sentiment": 0.0,
+        "bias": 0.5,
+        "readability": 50.0,
+        "originality": 0.5,
+        "plagiarism": 0.5,
+        "ai_detection": 0.5,
+        "main_topic": "General",
+        "secondary_topics": ["General"],
+        "reasoning": f"Analysis failed: {str(e)}"
+    }
+
+def analyze_batch_with_openai(texts: List[str]) -> List[Optional[Dict]]:
+    """
+    Analyze several texts with a single Ollama request
+    Returns one analysis per text; None marks texts the batch reply did not cover
+    """
+    results = [None if is_effectively_empty(text) else _cached_analysis(_analysis_key(text)) for text in texts]
+    pending = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None and not is_effectively_empty(text)))
+    if len(pending) < 2 or not client:
+        # Nothing to share a request with; callers analyze the rest one by one
+        return results
+    
+    items = orjson.dumps([{"id": i, "text": text} for i, text in enumerate(pending, 1)]).decode()
     try:
         response = client.chat.completions.create(
             model=ollama_model,
-            messages=[
-                {"role": "system", "content": "You are an expert content analyst. Analyze text and provide accurate scores. Always return valid JSON only."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=[_SYSTEM_MSG, {"role": "user", "content": _BATCH_PROMPT_PREFIX + items + "\n"}],
             temperature=0.3,
-            max_tokens=1000
+            max_tokens=_MAX_TOKENS * len(pending)
         )
-        
-        # Extract JSON from response
-        content = response.choices[0].message.content.strip()
-        
-        # Clean up the response to extract JSON
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        
-        # Parse JSON
-        result = json.loads(content)
-        
-        # Validate and clamp values
-        result["sentiment"] = max(-1.0, min(1.0, float(result.get("sentiment", 0.0))))
-        result["bias"] = max(0.0, min(1.0, float(result.get("bias", 0.5))))
-        result["readability"] = max(0.0, min(100.0, float(result.get("readability", 50.0))))
-        result["originality"] = max(0.0, min(1.0, float(result.get("originality", 0.5))))
-        result["plagiarism"] = max(0.0, min(1.0, float(result.get("plagiarism", 0.5))))
-        result["ai_detection"] = max(0.0, min(1.0, float(result.get("ai_detection", 0.5))))
-        result["main_topic"] = str(result.get("main_topic", "General"))
-        result["secondary_topics"] = list(result.get("secondary_topics", ["General"]))
-        result["reasoning"] = str(result.get("reasoning", "Analysis completed"))
-        
-        return result
-        
+        parsed = orjson.loads(_reply_json(response))
     except Exception as e:
-        print(f"❌ Ollama analysis error: {e}")
-        print("   💡 Make sure Ollama is running: ollama serve")
-        print(f"   💡 Make sure model is pulled: ollama pull {ollama_model}")
-        # Return default values on error
-        return {
-            "sentiment": 0.0,
-            "bias": 0.5,
-            "readability": 50.0,
-            "originality": 0.5,
-            "plagiarism": 0.5,
-            "ai_detection": 0.5,
-            "main_topic": "General",
-            "secondary_topics": ["General"],
-            "reasoning": f"Analysis failed: {str(e)}"
-        }
+        print(f"❌ Ollama batch analysis error: {e}")
+        return results
+    
+    # Match results to texts by id; a malformed entry only costs its own text a retry
+    analyses = {}
+    for item in parsed if isinstance(parsed, list) else []:
+        try:
+            index = int(item.pop("id"))
+            if 1 <= index <= len(pending):
+                analyses[pending[index - 1]] = _validate_analysis(item)
+        except Exception:
+            continue
+    for text, result in analyses.items():
+        _store_analysis(_analysis_key(text), result)
+    return [result if result is not None else analyses.get(text) for text, result in zip(texts, results)]
+
+async def embed_text_async(text: str) -> Optional[List[float]]:
+    """Embedding of text from the Ollama embedding model, or None if it is unavailable"""
+    if not async_client:
+        return None
+    try:
+        async with _slots():
+            response = await async_client.embeddings.create(model=ollama_embed_model, input=text)
+        return response.data[0].embedding
+    except Exception as e:
+        print(f"⚠️  Ollama embedding failed: {e}")
+        return None
+
+async def get_or_compute_analysis_async(text: str) -> Dict:
+    """Ollama analysis for text, reusing the cached result for the same or a near-duplicate text"""
+    key = _analysis_key(text)
+    result = await _cached_analysis_async(key)
+    if result is not None:
+        return result
+    
+    embedding = await embed_text_async(text) if _semantic_cache is not None else None
+    if embedding is not None:
+        result = _semantic_cache.get(embedding)
+        if result is not None:
+            await _store_analysis_async(key, result)
+            return result
+    
+    result = await analyze_content_with_openai_async(text)
+    # Successful analyses are the ones analyze_content_with_openai_async stored; fallbacks stay out
+    if embedding is not None and _analysis_cache.get(key) is result:
+        _semantic_cache.add(embedding, result)
+    return result
+
+# Readability patterns, compiled once at import
+_SENT_RE = re.compile(r"[.!?]+")
+_SUFFIX_RE = re.compile(r"(es|ed|ing)$")
+_VOWEL_RE = re.compile(r"[aeiouy]+")
 
 def calculate_readability_openai(text: str) -> Dict:
     """
     Calculate readability metrics (using local calculation, not API)
     """
-    if not text.strip():
+    if is_effectively_empty(text):
         return {
             "readabilityFleschKincaid": 0.0,
             "readabilityGunningFog": 0.0,
@@ -193,7 +437,7 @@ def calculate_readability_openai(text: str) -> Dict:
         }
     
     # Basic text analysis for fallback
-    sentences = max(len(re.findall(r"[.!?]+", text)), 1)
+    sentences = max(len(_SENT_RE.findall(text)), 1)
     words = [w for w in text.split() if w.strip()]
     word_count = len(words)
     
@@ -205,12 +449,15 @@ def calculate_readability_openai(text: str) -> Dict:
         }
     
     # Simple readability calculation as fallback
+    strip_suffix = _SUFFIX_RE.sub
+    find_vowels = _VOWEL_RE.findall
+    
     def count_syllables(word):
         word = word.lower().strip()
         if not word:
             return 0
-        word = re.sub(r'(es|ed|ing)$', '', word)
-        vowels = re.findall(r'[aeiouy]+', word)
+        word = strip_suffix('', word)
+        vowels = find_vowels(word)
         syllable_count = len(vowels)
         if word.endswith('e') and syllable_count > 1:
             syllable_count -= 1
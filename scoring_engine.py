@@ -2,15 +2,138 @@
 Scoring engine for content analysis and recommendations
 """
 import re
+import numpy as np
+from functools import lru_cache
 from typing import Tuple, Dict, List
-from models import ReadabilityResponse
+from models import ReadabilityResponse, TextFeatures
 from asi_one_client import get_comprehensive_analysis
 
+try:
+    from numba import njit, types
+except ImportError:
+    # numba not installed, syllables are counted with NumPy vector operations
+    njit = None
+
 # Dynamic weights system loaded
 
-def calculate_readability(text: str) -> ReadabilityResponse:
+# Readability patterns, compiled once at import
+_SENT_RE = re.compile(r"[.!?]+")
+_SUFFIX_RE = re.compile(r"(es|ed|ing)$")
+_VOWEL_RE = re.compile(r"[aeiouy]+")
+_PROPER_RE = re.compile(r"^[A-Z]")
+
+# Common words with 3+ syllables that shouldn't be considered complex
+_NONCOMPLEX = frozenset({
+    'beautiful', 'wonderful', 'terrible', 'possible', 'different', 'important',
+    'interesting', 'necessary', 'available', 'comfortable', 'responsible'
+})
+
+@lru_cache(maxsize=100_000)
+def count_syllables(word: str) -> int:
+    """More accurate syllable counting"""
+    word = word.lower().strip()
+    if not word:
+        return 0
+    
+    # Remove common suffixes that don't add syllables
+    word = _SUFFIX_RE.sub('', word)
+    
+    # Count vowel groups
+    vowels = _VOWEL_RE.findall(word)
+    syllable_count = len(vowels)
+    
+    # Handle silent 'e' at the end
+    if word.endswith('e') and syllable_count > 1:
+        syllable_count -= 1
+    
+    # Minimum 1 syllable per word
+    return max(syllable_count, 1)
+
+# Byte-level syllable counting for longer posts; below this the cached per-word path is faster
+VECTORIZE_MIN_WORDS = 64
+
+_IS_VOWEL = np.zeros(256, dtype=bool)
+_IS_VOWEL[list(b"aeiouy")] = True
+_I, _N, _G, _E, _S, _D = b"ingesd"
+
+def _syllable_counts_vectorized(lower: str) -> np.ndarray:
+    """count_syllables for every word of the lowercased text, computed over its UTF-8 bytes"""
+    # Three pad bytes keep the suffix lookbehinds in range; non-ASCII bytes are never vowels
+    buf = np.frombuffer(b"   " + " ".join(lower.split()).encode(), dtype=np.uint8)
+    spaces = np.flatnonzero(buf[3:] == 32) + 3
+    starts = np.concatenate(([3], spaces + 1))
+    ends = np.concatenate((spaces, [len(buf)]))
+    lengths = ends - starts
+    
+    # Remove common suffixes that don't add syllables
+    last, second, third = buf[ends - 1], buf[ends - 2], buf[ends - 3]
+    ing = (lengths >= 3) & (third == _I) & (second == _N) & (last == _G)
+    es_ed = ~ing & (lengths >= 2) & (second == _E) & ((last == _S) | (last == _D))
+    stem_ends = ends - 3 * ing - 2 * es_ed
+    
+    # Count vowel groups starting inside each stem
+    vowel = _IS_VOWEL[buf]
+    group_starts = vowel.copy()
+    group_starts[1:] &= ~vowel[:-1]
+    groups = np.concatenate(([0], np.cumsum(group_starts)))
+    counts = groups[stem_ends] - groups[starts]
+    
+    # Handle silent 'e' at the end, minimum 1 syllable per word
+    silent_e = (stem_ends > starts) & (buf[stem_ends - 1] == _E) & (counts > 1)
+    return np.maximum(counts - silent_e, 1)
+
+def _syllable_counts_loop(buf: np.ndarray) -> np.ndarray:
+    """count_syllables for every word of a single-space-joined, lowercased UTF-8 buffer, in one byte walk"""
+    counts = np.empty(buf.size // 2 + 1, dtype=np.int64)
+    n = 0
+    start = 0
+    for pos in range(buf.size + 1):
+        if pos < buf.size and buf[pos] != 32:
+            continue
+        
+        # Remove common suffixes that don't add syllables
+        stem = pos
+        if pos - start >= 3 and buf[pos - 3] == 105 and buf[pos - 2] == 110 and buf[pos - 1] == 103:
+            stem = pos - 3
+        elif pos - start >= 2 and buf[pos - 2] == 101 and (buf[pos - 1] == 115 or buf[pos - 1] == 100):
+            stem = pos - 2
+        
+        # Count vowel groups
+        groups = 0
+        in_group = False
+        for j in range(start, stem):
+            vowel = _IS_VOWEL[buf[j]]
+            if vowel and not in_group:
+                groups += 1
+            in_group = vowel
+        
+        # Handle silent 'e' at the end, minimum 1 syllable per word
+        if stem > start and buf[stem - 1] == 101 and groups > 1:
+            groups -= 1
+        counts[n] = max(groups, 1)
+        n += 1
+        start = pos + 1
+    return counts[:n]
+
+# Compiled eagerly with an explicit signature so the first request doesn't pay for the JIT
+_syllable_counts_jit = njit(
+    types.int64[:](types.Array(types.uint8, 1, "C", readonly=True)), cache=True
+)(_syllable_counts_loop) if njit else None
+
+def word_syllables(features: TextFeatures) -> np.ndarray:
+    """Syllable count of every word in the text"""
+    if features.word_count < VECTORIZE_MIN_WORDS:
+        return np.fromiter((count_syllables(word) for word in features.words), dtype=np.int64, count=features.word_count)
+    if _syllable_counts_jit is not None:
+        return _syllable_counts_jit(np.frombuffer(" ".join(features.lower.split()).encode(), dtype=np.uint8))
+    return _syllable_counts_vectorized(features.lower)
+
+# Readability is a pure function of the text; reposted content skips the whole computation
+@lru_cache(maxsize=4096)
+def calculate_readability(features: TextFeatures) -> ReadabilityResponse:
     """Calculate comprehensive readability metrics using multiple algorithms"""
-    if not text.strip():
+    text = features.text
+    if not features.word_count:
         return ReadabilityResponse(
             readabilityFleschKincaid=0.0,
             readabilityGunningFog=0.0,
@@ -18,39 +141,12 @@ def calculate_readability(text: str) -> ReadabilityResponse:
         )
     
     # Basic text analysis
-    sentences = max(len(re.findall(r"[.!?]+", text)), 1)
-    words = [w for w in text.split() if w.strip()]
-    word_count = len(words)
-    
-    if word_count == 0:
-        return ReadabilityResponse(
-            readabilityFleschKincaid=0.0,
-            readabilityGunningFog=0.0,
-            readabilityScore=0.0
-        )
-    
-    # Improved syllable counting
-    def count_syllables(word):
-        """More accurate syllable counting"""
-        word = word.lower().strip()
-        if not word:
-            return 0
-        
-        # Remove common suffixes that don't add syllables
-        word = re.sub(r'(es|ed|ing)$', '', word)
-        
-        # Count vowel groups
-        vowels = re.findall(r'[aeiouy]+', word)
-        syllable_count = len(vowels)
-        
-        # Handle silent 'e' at the end
-        if word.endswith('e') and syllable_count > 1:
-            syllable_count -= 1
-        
-        # Minimum 1 syllable per word
-        return max(syllable_count, 1)
+    sentences = max(len(_SENT_RE.findall(text)), 1)
+    words = features.words
+    word_count = features.word_count
     
-    total_syllables = sum(count_syllables(word) for word in words)
+    syllables = word_syllables(features)
+    total_syllables = int(syllables.sum())
     avg_syllables_per_word = total_syllables / word_count
     avg_words_per_sentence = word_count / sentences
     
@@ -60,14 +156,12 @@ def calculate_readability(text: str) -> ReadabilityResponse:
     # Gunning Fog Index (improved)
     # Complex words: 3+ syllables, excluding proper nouns and common suffixes
     complex_words = 0
-    for word in words:
-        if count_syllables(word) >= 3:
-            # Exclude common words that shouldn't be considered complex
-            if not re.match(r'^[A-Z]', word) and word.lower() not in [
-                'beautiful', 'wonderful', 'terrible', 'possible', 'different', 'important',
-                'interesting', 'necessary', 'available', 'comfortable', 'responsible'
-            ]:
-                complex_words += 1
+    is_proper = _PROPER_RE.match
+    for i in np.flatnonzero(syllables >= 3):
+        word = words[i]
+        # Exclude common words that shouldn't be considered complex
+        if not is_proper(word) and word.lower() not in _NONCOMPLEX:
+            complex_words += 1
     
     gf = 0.4 * (avg_words_per_sentence + 100 * (complex_words / word_count))
     
@@ -76,10 +170,11 @@ def calculate_readability(text: str) -> ReadabilityResponse:
     if sentences >= 30:
         smog = 1.043 * (30 * (complex_words / sentences)) ** 0.5 + 3.1291
     else:
-        smog = 1.043 * (word_count * (complex_words / word_count)) ** 0.5 + 3.1291
+        # word_count * (complex_words / word_count) is just complex_words
+        smog = 1.043 * complex_words ** 0.5 + 3.1291
     
     # Coleman-Liau Index
-    chars = len(re.sub(r'\s', '', text))
+    chars = features.char_count
     cl = 0.0588 * (chars / word_count * 100) - 0.296 * (sentences / word_count * 100) - 15.8
     
     # Average all metrics for a comprehensive score
@@ -135,15 +230,71 @@ def calculate_length_score(word_count: int) -> float:
     
     return max(0.0, min(100.0, length_score))
 
+def _normalize(weights: Dict[str, float]) -> Dict[str, float]:
+    """Scale weights so they sum to 1.0"""
+    total = sum(weights.values())
+    if total == 1.0:
+        return weights
+    return {key: value / total for key, value in weights.items()}
+
+def _weight_tier(weights: Dict[str, float]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Normalized weights and the base weights used without AI detection and originality (they are multipliers)"""
+    weights = _normalize(weights)
+    base_weights = _normalize({key: weights[key] for key in ('sentiment', 'bias', 'readability', 'length')})
+    return weights, base_weights
+
+# Dynamic weight tiers, indexed by the length score upper bound; constant, so normalized once at import
+_WEIGHT_TIERS = (
+    (20, _weight_tier({  # Very short content (< ~25 words)
+        'sentiment': 0.05,
+        'bias': 0.10,
+        'readability': 0.05,
+        'originality': 0.10,
+        'authenticity': 0.10,
+        'length': 0.60
+    })),
+    (40, _weight_tier({  # Short content (~25-50 words)
+        'sentiment': 0.10,
+        'bias': 0.15,
+        'readability': 0.05,
+        'originality': 0.15,
+        'authenticity': 0.15,
+        'length': 0.40
+    })),
+    (60, _weight_tier({  # Medium-short content (~50-75 words)
+        'sentiment': 0.12,
+        'bias': 0.18,
+        'readability': 0.08,
+        'originality': 0.22,
+        'authenticity': 0.20,
+        'length': 0.20
+    })),
+    (float('inf'), _weight_tier({  # Normal content (75+ words)
+        'sentiment': 0.15,
+        'bias': 0.20,
+        'readability': 0.10,
+        'originality': 0.30,
+        'authenticity': 0.15,
+        'length': 0.10
+    }))
+)
+
+def _weights_for(length_score: float) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Weight tier for a length score"""
+    for threshold, tier in _WEIGHT_TIERS:
+        if length_score < threshold:
+            return tier
+    return _WEIGHT_TIERS[-1][1]
+
 async def calculate_overall_score(sentiment_score: float, bias_score: float, readability_fk: float, 
-                          originality_score: float, plagiarism_score: float, text: str = "") -> Tuple[int, Dict, List[str]]:
+                          originality_score: float, plagiarism_score: float, features: TextFeatures) -> Tuple[int, Dict, List[str]]:
     """Calculate overall content score with ASI:One integration and averaged scoring"""
     
     # Get comprehensive analysis from ASI:One in single API call
-    asi_analysis = await get_comprehensive_analysis(text)
+    asi_analysis = await get_comprehensive_analysis(features)
     
     # Calculate text length score
-    word_count = len(text.split()) if text else 0
+    word_count = features.word_count
     length_score = calculate_length_score(word_count)
     
     # Normalize our calculated scores to 0-100 scale
@@ -162,61 +313,7 @@ async def calculate_overall_score(sentiment_score: float, bias_score: float, rea
     print(f"🔍 Authenticity score: {asi_ai_detection_normalized}")
     
     # Dynamic weight adjustment based on length score
-    if length_score < 20:  # Very short content (< ~25 words)
-        weights = {
-            'sentiment': 0.05,
-            'bias': 0.10,
-            'readability': 0.05,
-            'originality': 0.10,
-            'authenticity': 0.10,
-            'length': 0.60
-        }
-    elif length_score < 40:  # Short content (~25-50 words)
-        weights = {
-            'sentiment': 0.10,
-            'bias': 0.15,
-            'readability': 0.05,
-            'originality': 0.15,
-            'authenticity': 0.15,
-            'length': 0.40
-        }
-    elif length_score < 60:  # Medium-short content (~50-75 words)
-        weights = {
-            'sentiment': 0.12,
-            'bias': 0.18,
-            'readability': 0.08,
-            'originality': 0.22,
-            'authenticity': 0.20,
-            'length': 0.20
-        }
-    else:  # Normal content (75+ words)
-        weights = {
-            'sentiment': 0.15,
-            'bias': 0.20,
-            'readability': 0.10,
-            'originality': 0.30,
-            'authenticity': 0.15,
-            'length': 0.10
-        }
-    
-    # Ensure weights sum to 1.0
-    total_weight = sum(weights.values())
-    if total_weight != 1.0:
-        for key in weights:
-            weights[key] = weights[key] / total_weight
-    
-    # Calculate base score WITHOUT AI detection and originality (they will be multipliers)
-    base_weights = {
-        'sentiment': weights['sentiment'],
-        'bias': weights['bias'],
-        'readability': weights['readability'],
-        'length': weights['length']
-    }
-    
-    # Normalize base weights to sum to 1.0
-    base_weight_sum = sum(base_weights.values())
-    for key in base_weights:
-        base_weights[key] = base_weights[key] / base_weight_sum
+    weights, base_weights = _weights_for(length_score)
     
     # Calculate base score without AI and originality
     base_score = (
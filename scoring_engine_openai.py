@@ -2,9 +2,18 @@
 OpenAI-based scoring engine for content analysis and recommendations
 """
 import re
+import asyncio
+import operator
+import numpy as np
 from typing import Tuple, Dict, List
 from models import ReadabilityResponse
-from openai_client import analyze_content_with_openai, calculate_readability_openai
+from openai_client import is_effectively_empty, get_or_compute_analysis_async, analyze_batch_with_openai, calculate_readability_openai
+
+try:
+    from numba import njit, types
+except ImportError:
+    # numba not installed, words are counted with str.split
+    njit = None
 
 # Dynamic weights for different content types
 WEIGHTS = {
@@ -16,67 +25,114 @@ WEIGHTS = {
     "length": 0.10
 }
 
+# Score breakdown rows in report order, with the weight applied to each
+# (plagiarism is reported against the originality weight but is not part of the overall score)
+_BREAKDOWN_ROWS = ('sentiment', 'bias', 'readability', 'originality', 'plagiarism', 'authenticity', 'length')
+_BREAKDOWN_WEIGHTS = tuple(WEIGHTS['originality' if row == 'plagiarism' else row] for row in _BREAKDOWN_ROWS)
+_BREAKDOWN_WEIGHTS_ARR = np.array(_BREAKDOWN_WEIGHTS)
+_OVERALL_ROWS = np.array([i for i, row in enumerate(_BREAKDOWN_ROWS) if row != 'plagiarism'])
+def _empty_result() -> Tuple[int, Dict, List[str]]:
+    """Result for empty content; built per call, so one caller's edits never leak into another's result"""
+    breakdown = {
+        row: {'our_score': 0, 'final_score': 0, 'weight': weight, 'contribution': 0}
+        for row, weight in zip(_BREAKDOWN_ROWS, _BREAKDOWN_WEIGHTS)
+    }
+    breakdown['overall'] = {'final_score': 0, 'reasoning': 'Empty content provided'}
+    return 0, breakdown, ["Empty content provided"]
+
+# Recommendation rules in report order: (score, threshold, comparison, message)
+_RULES = (
+    ('ai_detection', 0.7, operator.gt, "Content appears to be AI-generated. Consider adding more human perspective and personal insights."),
+    ('plagiarism', 0.7, operator.gt, "High plagiarism detected. Ensure content is original and properly attributed."),
+    ('bias', 0.7, operator.gt, "Content shows significant bias. Consider presenting multiple perspectives."),
+    ('readability', 30, operator.lt, "Content is difficult to read. Consider simplifying language and sentence structure."),
+    ('originality', 0.3, operator.lt, "Content lacks originality. Add unique insights, examples, or personal experiences."),
+    ('length', 30, operator.lt, "Content is too short. Expand with more details, examples, or explanations."),
+)
+
+# Direction the AI detection penalty moves each row
+_PENALTY_SIGNS = np.array([{'plagiarism': 1.0, 'length': 0.0}.get(row, -1.0) for row in _BREAKDOWN_ROWS])
+
 def calculate_readability(text: str) -> ReadabilityResponse:
-    """Calculate comprehensive readability metrics using OpenAI"""
-    if not text.strip():
-        return ReadabilityResponse(
-            readabilityFleschKincaid=0.0,
-            readabilityGunningFog=0.0,
-            readabilityScore=0.0
-        )
-    
-    # Get readability from OpenAI analysis
-    analysis = analyze_content_with_openai(text)
-    readability_score = analysis["readability"]
-    
-    # Convert to Flesch-Kincaid and Gunning Fog scales
-    # Higher readability score = lower grade level = easier to read
-    fk_grade = max(0, (100 - readability_score) / 10)  # Convert to grade level
-    fog_index = max(0, (100 - readability_score) / 8)   # Convert to fog index
-    
-    return ReadabilityResponse(
-        readabilityFleschKincaid=fk_grade,
-        readabilityGunningFog=fog_index,
-        readabilityScore=readability_score
+    """Calculate Flesch-Kincaid, Gunning Fog and a 0-100 readability score locally, without a model call"""
+    return ReadabilityResponse(**calculate_readability_openai(text))
+
+def _count_words_loop(buf: np.ndarray) -> int:
+    """Whitespace-separated words in ASCII text bytes, split on the same whitespace as str.split()"""
+    count = 0
+    in_word = False
+    for byte in buf:
+        is_space = byte == 32 or 9 <= byte <= 13 or 28 <= byte <= 31
+        if not is_space and not in_word:
+            count += 1
+        in_word = not is_space
+    return count
+
+# Compiled when the module is imported (explicit signature), so the first call pays no JIT cost
+_count_words_jit = njit(
+    types.int64(types.Array(types.uint8, 1, "C", readonly=True)), cache=True
+)(_count_words_loop) if njit else None
+
+# Below this length str.split() is faster than the call into the compiled loop
+JIT_MIN_CHARS = 128
+
+def count_words(text: str) -> int:
+    """Number of whitespace-separated words in text, without building the word list"""
+    # Non-ASCII text may contain Unicode whitespace, which only str.split() knows about
+    if _count_words_jit is not None and len(text) >= JIT_MIN_CHARS and text.isascii():
+        return _count_words_jit(np.frombuffer(text.encode(), dtype=np.uint8))
+    return len(text.split())
+
+# Exclusive word-count upper bound of each length bucket below the long-content tier
+_LENGTH_BOUNDS = (10, 25, 50, 100)
+
+def calculate_length_scores_batch(texts: List[str]) -> np.ndarray:
+    """Length-based scores for several texts at once, with penalties for very short content"""
+    word_counts = np.fromiter((count_words(text) for text in texts), dtype=np.int64, count=len(texts))
+    
+    # First matching bucket wins, as in an if/elif cascade
+    return np.select(
+        [word_counts < bound for bound in _LENGTH_BOUNDS],
+        [
+            word_counts * 2.0,  # Very short content gets low score
+            20 + (word_counts - 10) * 1.5,  # Short content penalty
+            42.5 + (word_counts - 25) * 1.0,  # Medium content
+            67.5 + (word_counts - 50) * 0.5,  # Good length
+        ],
+        default=92.5 + np.minimum(word_counts - 100, 50) * 0.15  # Long content bonus
     )
 
 def calculate_length_score(text: str) -> float:
     """Calculate length-based score with penalties for very short content"""
-    if not text.strip():
-        return 0.0
-    
-    word_count = len(text.split())
-    
-    # Length scoring with penalties for short content
-    if word_count < 10:
-        return max(0.0, word_count * 2)  # Very short content gets low score
-    elif word_count < 25:
-        return max(0.0, 20 + (word_count - 10) * 1.5)  # Short content penalty
-    elif word_count < 50:
-        return max(0.0, 42.5 + (word_count - 25) * 1.0)  # Medium content
-    elif word_count < 100:
-        return max(0.0, 67.5 + (word_count - 50) * 0.5)  # Good length
-    else:
-        return max(0.0, 92.5 + min(word_count - 100, 50) * 0.15)  # Long content bonus
+    return float(calculate_length_scores_batch([text])[0])
 
 async def calculate_overall_score(text: str = "") -> Tuple[int, Dict, List[str]]:
     """Calculate overall content score using OpenAI analysis"""
     
-    if not text.strip():
-        return 0, {
-            'sentiment': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['sentiment'], 'contribution': 0},
-            'bias': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['bias'], 'contribution': 0},
-            'readability': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['readability'], 'contribution': 0},
-            'originality': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['originality'], 'contribution': 0},
-            'plagiarism': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['originality'], 'contribution': 0},
-            'authenticity': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['authenticity'], 'contribution': 0},
-            'length': {'our_score': 0, 'final_score': 0, 'weight': WEIGHTS['length'], 'contribution': 0},
-            'overall': {'final_score': 0, 'reasoning': 'Empty content provided'}
-        }, ["Empty content provided"]
+    if is_effectively_empty(text):
+        return _empty_result()
     
     # Get comprehensive analysis from OpenAI
-    analysis = analyze_content_with_openai(text)
-    
+    analysis = await get_or_compute_analysis_async(text)
+    return _score_analysis(analysis, calculate_length_score(text))
+
+async def calculate_overall_score_batch(texts: List[str]) -> List[Tuple[int, Dict, List[str]]]:
+    """Calculate overall scores for several texts, analyzing them with one OpenAI request"""
+    analyses = await asyncio.to_thread(analyze_batch_with_openai, texts)
+    
+    # Texts the batch reply did not cover are analyzed individually, concurrently
+    missing = list(dict.fromkeys(text for text, analysis in zip(texts, analyses) if analysis is None and not is_effectively_empty(text)))
+    retried = dict(zip(missing, await asyncio.gather(*(get_or_compute_analysis_async(text) for text in missing))))
+    analyses = [analysis if analysis is not None else retried.get(text) for text, analysis in zip(texts, analyses)]
+    
+    length_scores = calculate_length_scores_batch(texts).tolist()
+    return [
+        await calculate_overall_score(text) if is_effectively_empty(text) else _score_analysis(analysis, length_score)
+        for text, analysis, length_score in zip(texts, analyses, length_scores)
+    ]
+
+def _score_analysis(analysis: Dict, length_score: float) -> Tuple[int, Dict, List[str]]:
+    """Overall score, breakdown and recommendations from a text's OpenAI analysis and length score"""
     # Extract scores
     sentiment_score = analysis["sentiment"]
     bias_score = analysis["bias"]
@@ -85,9 +141,6 @@ async def calculate_overall_score(text: str = "") -> Tuple[int, Dict, List[str]]
     plagiarism_score = analysis["plagiarism"]
     ai_detection_score = analysis["ai_detection"]
     
-    # Calculate length score
-    length_score = calculate_length_score(text)
-    
     # Normalize scores to 0-100 scale
     sentiment_normalized = ((sentiment_score + 1) / 2) * 100  # -1 to +1 -> 0 to 100
     bias_normalized = (1 - bias_score) * 100  # 0 to 1 -> 100 to 0 (lower bias = higher score)
@@ -96,100 +149,42 @@ async def calculate_overall_score(text: str = "") -> Tuple[int, Dict, List[str]]
     plagiarism_normalized = plagiarism_score * 100  # 0 to 1 -> 0 to 100
     authenticity_normalized = (1 - ai_detection_score) * 100  # Convert AI detection to authenticity score
     
-    # Apply AI detection penalty
+    # Apply AI detection penalty: raises plagiarism, leaves length alone and lowers every other row
     ai_penalty = ai_detection_score * 50  # Up to 50 point penalty for AI content
-    final_sentiment = max(0, sentiment_normalized - ai_penalty)
-    final_bias = max(0, bias_normalized - ai_penalty)
-    final_readability = max(0, readability_normalized - ai_penalty)
-    final_originality = max(0, originality_normalized - ai_penalty)
-    final_plagiarism = min(100, plagiarism_normalized + ai_penalty)  # Increase plagiarism for AI content
-    final_authenticity = max(0, authenticity_normalized - ai_penalty)
+    normalized = [sentiment_normalized, bias_normalized, readability_normalized, originality_normalized,
+                  plagiarism_normalized, authenticity_normalized, length_score]
+    finals = np.array(normalized, dtype=np.float64)
+    finals += ai_penalty * _PENALTY_SIGNS
+    np.clip(finals, 0.0, 100.0, out=finals)
     
-    # Calculate weighted overall score
-    overall_score = (
-        final_sentiment * WEIGHTS['sentiment'] +
-        final_bias * WEIGHTS['bias'] +
-        final_readability * WEIGHTS['readability'] +
-        final_originality * WEIGHTS['originality'] +
-        final_authenticity * WEIGHTS['authenticity'] +
-        length_score * WEIGHTS['length']
-    )
+    # Weight every row once; the overall score and the breakdown share the products
+    contributions = finals * _BREAKDOWN_WEIGHTS_ARR
+    overall_score = float(contributions[_OVERALL_ROWS].sum())
     
     # Round to integer
     final_score = max(0, min(100, round(overall_score)))
     
     # Generate recommendations
-    recommendations = []
-    
-    if ai_detection_score > 0.7:
-        recommendations.append("Content appears to be AI-generated. Consider adding more human perspective and personal insights.")
-    
-    if plagiarism_score > 0.7:
-        recommendations.append("High plagiarism detected. Ensure content is original and properly attributed.")
-    
-    if bias_score > 0.7:
-        recommendations.append("Content shows significant bias. Consider presenting multiple perspectives.")
-    
-    if readability_score < 30:
-        recommendations.append("Content is difficult to read. Consider simplifying language and sentence structure.")
-    
-    if originality_score < 0.3:
-        recommendations.append("Content lacks originality. Add unique insights, examples, or personal experiences.")
-    
-    if length_score < 30:
-        recommendations.append("Content is too short. Expand with more details, examples, or explanations.")
-    
+    scores = {**analysis, 'length': length_score}
+    recommendations = [message for key, threshold, compare, message in _RULES if compare(scores[key], threshold)]
     if not recommendations:
         recommendations.append("Content meets quality standards across all metrics.")
     
     # Prepare detailed score breakdown
     score_breakdown = {
-        'sentiment': {
-            'our_score': round(sentiment_normalized, 1),
-            'final_score': round(final_sentiment, 1),
-            'weight': WEIGHTS['sentiment'],
-            'contribution': round(final_sentiment * WEIGHTS['sentiment'], 1)
-        },
-        'bias': {
-            'our_score': round(bias_normalized, 1),
-            'final_score': round(final_bias, 1),
-            'weight': WEIGHTS['bias'],
-            'contribution': round(final_bias * WEIGHTS['bias'], 1)
-        },
-        'readability': {
-            'our_score': round(readability_normalized, 1),
-            'final_score': round(final_readability, 1),
-            'weight': WEIGHTS['readability'],
-            'contribution': round(final_readability * WEIGHTS['readability'], 1)
-        },
-        'originality': {
-            'our_score': round(originality_normalized, 1),
-            'final_score': round(final_originality, 1),
-            'weight': WEIGHTS['originality'],
-            'contribution': round(final_originality * WEIGHTS['originality'], 1)
-        },
-        'plagiarism': {
-            'our_score': round(plagiarism_normalized, 1),
-            'final_score': round(final_plagiarism, 1),
-            'weight': WEIGHTS['originality'],
-            'contribution': round(final_plagiarism * WEIGHTS['originality'], 1)
-        },
-        'authenticity': {
-            'our_score': round(authenticity_normalized, 1),
-            'final_score': round(final_authenticity, 1),
-            'weight': WEIGHTS['authenticity'],
-            'contribution': round(final_authenticity * WEIGHTS['authenticity'], 1)
-        },
-        'length': {
-            'our_score': round(length_score, 1),
-            'final_score': round(length_score, 1),
-            'weight': WEIGHTS['length'],
-            'contribution': round(length_score * WEIGHTS['length'], 1)
-        },
-        'overall': {
-            'final_score': final_score,
-            'reasoning': analysis.get("reasoning", "Analysis completed")
+        row: {
+            'our_score': round(our_score, 1),
+            'final_score': round(final, 1),
+            'weight': weight,
+            'contribution': round(contribution, 1)
         }
+        for row, our_score, final, weight, contribution in zip(
+            _BREAKDOWN_ROWS, normalized, finals.tolist(), _BREAKDOWN_WEIGHTS, contributions.tolist()
+        )
+    }
+    score_breakdown['overall'] = {
+        'final_score': final_score,
+        'reasoning': analysis.get("reasoning", "Analysis completed")
     }
     
     return final_score, score_breakdown, recommendations
@@ -0,0 +1,66 @@
+"""
+Semantic cache for Ollama content analysis: reuses the analysis of a near-duplicate post
+"""
+import os
+import threading
+import numpy as np
+from typing import Dict, Optional
+
+# Cosine similarity above which two posts are treated as the same content
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.86"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+
+
+class SemanticCache:
+    """Bounded store of (unit embedding, analysis) pairs searched by cosine similarity; oldest entries are overwritten first"""
+
+    def __init__(self, maxsize: int, threshold: float):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._vectors = None  # (maxsize, dim) matrix, allocated on the first insert
+        self._analyses = [None] * maxsize
+        self._count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding) -> Optional[Dict]:
+        """Analysis of the most similar stored post, if it is similar enough"""
+        query = self._unit(embedding)
+        with self._lock:
+            if not self._count or query.shape[0] != self._vectors.shape[1]:
+                return None
+            # Unit vectors, so one matrix-vector product gives every cosine similarity
+            similarities = self._vectors[:self._count] @ query
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return None
+            return self._analyses[best]
+
+    def add(self, embedding, analysis: Dict):
+        if self.maxsize <= 0:
+            return
+        vector = self._unit(embedding)
+        with self._lock:
+            if self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+                # First insert, or the embedding model changed: start over
+                self._vectors = np.empty((self.maxsize, vector.shape[0]), dtype=np.float32)
+                self._analyses = [None] * self.maxsize
+                self._count = 0
+                self._next = 0
+            self._vectors[self._next] = vector
+            self._analyses[self._next] = analysis
+            self._next = (self._next + 1) % self.maxsize
+            self._count = min(self._count + 1, self.maxsize)
+
+    def clear(self):
+        with self._lock:
+            self._vectors = None
+            self._analyses = [None] * self.maxsize
+            self._count = 0
+            self._next = 0
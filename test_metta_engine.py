@@ -0,0 +1,104 @@
+"""
+Tests for bias pattern matching in the MeTTa engine
+"""
+import re
+import asyncio
+import pytest
+import metta_engine
+from hyperon import MeTTa
+from models import TextFeatures
+
+
+@pytest.fixture(params=["automaton", "substring"])
+def matcher(request, monkeypatch):
+    """Run each test with the Aho-Corasick automaton and with the plain substring fallback"""
+    if request.param == "automaton" and metta_engine._automaton is None:
+        pytest.skip("pyahocorasick not installed")
+    if request.param == "substring":
+        monkeypatch.setattr(metta_engine, "_automaton", None)
+
+
+def matched(text: str) -> list:
+    return [metta_engine.bias_patterns[i][0] for i in metta_engine.match_bias_patterns(text.lower())]
+
+
+def test_keyword_matches_a_whole_token(matcher):
+    assert matched("What a Disaster! Gen-Z never learns.") == ["never", "disaster", "gen-z"]
+
+
+def test_phrase_matches_across_words(matcher):
+    assert matched("Everyone knows it is 100% guaranteed.") == ["everyone knows", "100%", "guaranteed"]
+
+
+def test_keyword_inside_a_longer_word_does_not_match(matcher):
+    # "hell", "ass" and "cancel" used to match as substrings of these words
+    assert matched("Hello, the classic cancellation policy") == []
+
+
+def test_text_shorter_than_every_pattern_skips_the_scan(monkeypatch):
+    monkeypatch.setattr(metta_engine, "_analyze_bias_sync", lambda features: pytest.fail("scanned short text"))
+    assert len("ok") < metta_engine._MIN_PATTERN_LEN
+    result = asyncio.run(metta_engine.analyze_bias_metta(TextFeatures.from_text("ok")))
+
+    assert result.biasDetectionScore == 0.0
+    assert result.biasDetectionDirection == "neutral"
+    assert result.matchedWords == []
+
+
+def test_text_as_long_as_the_shortest_pattern_is_scanned(matcher):
+    shortest = min((pattern for pattern, _ in metta_engine.bias_patterns), key=len)
+    assert len(shortest) == metta_engine._MIN_PATTERN_LEN
+    metta_engine._analyze_bias_sync.cache_clear()
+    result = asyncio.run(metta_engine.analyze_bias_metta(TextFeatures.from_text(shortest.upper())))
+
+    assert result.matchedWords == [shortest]
+
+
+# The rules as the per-atom load added them, one add-atom each
+RULES = (
+    "(rule-bias (if (and (contains-word $post $word) (extreme-word $word $score)) (set-bias-score $post $score)))",
+    "(rule-bias (if (and (contains-word $post $word) (polarizing-word $word $score)) (set-bias-score $post $score)))",
+    '(rule-fact-check (if (contains-claim $post "100%" "guaranteed" "proven" "scientific fact") (flag-uncertainty $post 0.8)))',
+    '(rule-emotional-manipulation (if (contains-phrase $post "you must" "everyone knows" "obviously" "clearly") (set-manipulation-score $post 0.6)))',
+)
+
+QUERIES = (
+    "!(match &self (extreme-word $word $score) ($word $score))",
+    "!(match &self (polarizing-word $word $score) ($word $score))",
+    "!(match &self (profanity-word $word $score) ($word $score))",
+    '!(match &self (extreme-word "disaster" $score) $score)',
+    '!(match &self (profanity-word "hello" $score) $score)',
+    "!(match &self (rule-bias $rule) (quote $rule))",
+    "!(match &self (rule-fact-check $rule) (quote $rule))",
+    "!(match &self (rule-emotional-manipulation $rule) (quote $rule))",
+)
+
+
+def per_atom_knowledge_base() -> MeTTa:
+    """The knowledge base loaded one add-atom run per fact and rule, each targeting &self"""
+    reference = MeTTa()
+    categories = (
+        ("extreme-word", metta_engine.extreme_words, 0.9),
+        ("polarizing-word", metta_engine.polarizing_words, 0.7),
+        ("profanity-word", metta_engine.profanity_words, 0.8),
+    )
+    for category, words, score in categories:
+        for word in words:
+            reference.run(f'!(add-atom &self ({category} "{word}" {score}))')
+    for rule in RULES:
+        reference.run(f"!(add-atom &self {rule})")
+    return reference
+
+
+def answers(metta: MeTTa, query: str) -> list:
+    # Variables are renamed apart on every query, so compare them by name only
+    return sorted(re.sub(r"#\d+", "", str(atom)) for result in metta.run(query) for atom in result)
+
+
+def test_single_run_load_answers_like_the_per_atom_load():
+    reference = per_atom_knowledge_base()
+
+    assert answers(metta_engine.metta, QUERIES[0])
+    for query in QUERIES:
+        assert answers(metta_engine.metta, query) == answers(reference, query), query
+    assert sorted(map(str, metta_engine.metta.space().get_atoms())) == sorted(map(str, reference.space().get_atoms()))
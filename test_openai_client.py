@@ -0,0 +1,221 @@
+"""
+Tests for the Ollama analysis cache, using a stub client instead of a running Ollama server
+"""
+import asyncio
+from types import SimpleNamespace
+import orjson
+import openai_client
+from semantic_cache import SemanticCache
+from cache import SQLiteCache
+from scoring_engine_openai import calculate_overall_score, calculate_overall_score_batch, calculate_readability
+
+
+class FakeOllama:
+    """Counts chat completion calls and answers each with a fixed analysis, or raises"""
+
+    def __init__(self, fail=False, embeddings=None, batch_ids=None):
+        self.calls = 0
+        self.batch_calls = 0
+        # batch_ids(ids) -> the ids a batch reply answers; all of them by default
+        self.batch_ids = batch_ids or (lambda ids: ids)
+        self.fail = fail
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        # embeddings: text -> vector served by the embeddings endpoint
+        self.vectors = embeddings or {}
+        self.embeddings = SimpleNamespace(create=self.embed)
+
+    def embed(self, model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.vectors[input])])
+
+    def create(self, messages, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("ollama is down")
+        prompt = messages[1]["content"]
+        analysis = {"sentiment": 0.4, "bias": 0.1, "readability": 70, "main_topic": "Tech"}
+        if prompt.startswith(openai_client._BATCH_PROMPT_PREFIX):
+            self.batch_calls += 1
+            items = orjson.loads(prompt[len(openai_client._BATCH_PROMPT_PREFIX):])
+            ids = self.batch_ids([item["id"] for item in items])
+            reply = [dict(analysis, id=i, main_topic=items[i - 1]["text"]) for i in ids]
+        else:
+            reply = analysis
+        content = orjson.dumps(reply).decode()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def awaitable(fn):
+    async def call(**kwargs):
+        return fn(**kwargs)
+    return call
+
+
+def analyze(text):
+    """get_or_compute_analysis_async on a fresh event loop"""
+    return asyncio.run(openai_client.get_or_compute_analysis_async(text))
+
+
+def use_fake(monkeypatch, fake: FakeOllama, semantic=False):
+    monkeypatch.setattr(openai_client, "client", fake)
+    # The async client shares the fake's calls and counters
+    monkeypatch.setattr(openai_client, "async_client", SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=awaitable(fake.create))),
+        embeddings=SimpleNamespace(create=awaitable(fake.embed))
+    ))
+    monkeypatch.setattr(openai_client, "_semantic_cache", SemanticCache(16, 0.86) if semantic else None)
+    openai_client._analysis_cache.clear()
+
+
+def test_repeated_text_is_analyzed_once(monkeypatch):
+    fake = FakeOllama()
+    use_fake(monkeypatch, fake)
+
+    first = analyze("Same post")
+    second = analyze("Same post")
+
+    assert fake.calls == 1
+    assert second == first
+    assert first["main_topic"] == "Tech"
+
+
+def test_failed_analysis_is_not_cached(monkeypatch):
+    fake = FakeOllama(fail=True)
+    use_fake(monkeypatch, fake)
+
+    assert analyze("Flaky post")["reasoning"].startswith("Analysis failed")
+    fake.fail = False
+    assert analyze("Flaky post")["main_topic"] == "Tech"
+    assert fake.calls == 2
+
+
+def test_near_duplicate_reuses_the_analysis(monkeypatch):
+    fake = FakeOllama(embeddings={
+        "Rust is fast": [1.0, 0.0, 0.1],
+        "Rust is quite fast": [0.98, 0.05, 0.12],
+        "Cats sleep a lot": [0.0, 1.0, 0.0],
+    })
+    use_fake(monkeypatch, fake, semantic=True)
+
+    first = analyze("Rust is fast")
+    assert analyze("Rust is quite fast") is first
+    assert fake.calls == 1
+
+    analyze("Cats sleep a lot")
+    assert fake.calls == 2
+
+
+def test_batch_scores_texts_with_one_request(monkeypatch):
+    fake = FakeOllama()
+    use_fake(monkeypatch, fake)
+    texts = ["First post here", "Second post here", "First post here", ""]
+
+    results = asyncio.run(calculate_overall_score_batch(texts))
+
+    assert fake.calls == 1
+    assert len(results) == 4
+    assert results[0] == results[2]
+    assert results[3][0] == 0
+    assert analyze("Second post here")["main_topic"] == "Second post here"
+
+
+def test_batch_retries_items_missing_from_the_reply(monkeypatch):
+    fake = FakeOllama(batch_ids=lambda ids: ids[:1])
+    use_fake(monkeypatch, fake)
+
+    results = asyncio.run(calculate_overall_score_batch(["Alpha post", "Beta post", "Gamma post"]))
+
+    assert len(results) == 3
+    assert fake.batch_calls == 1
+    assert fake.calls == 3
+
+
+def test_empty_results_are_not_shared(monkeypatch):
+    use_fake(monkeypatch, FakeOllama())
+    _, breakdown, recommendations = asyncio.run(calculate_overall_score(""))
+    recommendations.append("Edited by a caller")
+    breakdown["overall"]["reasoning"] = "Edited by a caller"
+
+    again = asyncio.run(calculate_overall_score("   "))
+
+    assert again[2] == ["Empty content provided"]
+    assert again[1]["overall"]["reasoning"] == "Empty content provided"
+
+
+def test_concurrent_scoring_awaits_the_async_client(monkeypatch):
+    fake = FakeOllama()
+    use_fake(monkeypatch, fake)
+    monkeypatch.setattr(openai_client, "client", None)  # Any blocking call would fall back to defaults
+
+    async def score_all():
+        return await asyncio.gather(*(calculate_overall_score(t) for t in ["One post", "Two posts"]))
+
+    results = asyncio.run(score_all())
+
+    assert all(breakdown["overall"]["reasoning"] == "Analysis completed" for _, breakdown, _ in results)
+    assert fake.calls == 2
+
+
+def test_async_requests_are_capped(monkeypatch):
+    fake = FakeOllama()
+    in_flight = peak = 0
+
+    async def create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return fake.create(**kwargs)
+
+    use_fake(monkeypatch, fake)
+    monkeypatch.setattr(openai_client.async_client.chat.completions, "create", create)
+    monkeypatch.setattr(openai_client, "OLLAMA_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(openai_client, "_request_slots", None)
+
+    async def analyze_all():
+        return await asyncio.gather(*(openai_client.analyze_content_with_openai_async(f"Post {i}") for i in range(6)))
+
+    asyncio.run(analyze_all())
+
+    assert fake.calls == 6
+    assert peak == 2
+
+
+def test_readability_is_computed_locally(monkeypatch):
+    fake = FakeOllama()
+    use_fake(monkeypatch, fake)
+
+    result = calculate_readability("The cat sat on the mat. It was a sunny day.")
+
+    assert fake.calls == 0
+    assert result.readabilityFleschKincaid < 5
+    assert calculate_readability("   ").readabilityScore == 0.0
+
+
+def test_sqlite_cache_reads_back_across_instances(tmp_path):
+    path = str(tmp_path / "values.db")
+    writer = SQLiteCache(path, 3600)
+    writer.set("key", {"score": 0.5, "topics": ["Tech"]})
+    writer.close()
+
+    reader = SQLiteCache(path, 3600)
+    assert reader.get("key") == {"score": 0.5, "topics": ["Tech"]}
+    assert reader.get("missing") is None
+    reader.close()
+
+
+def test_persisted_analysis_survives_a_restart(monkeypatch, tmp_path):
+    path = str(tmp_path / "analyses.db")
+    fake = FakeOllama()
+    use_fake(monkeypatch, fake)
+    monkeypatch.setattr(openai_client, "_disk_cache", SQLiteCache(path, 3600))
+    first = asyncio.run(openai_client.get_or_compute_analysis_async("Persistent post"))
+    openai_client._disk_cache.close()
+
+    # A new process: empty in-process tier, fresh connection to the same file
+    restarted = FakeOllama()
+    use_fake(monkeypatch, restarted)
+    monkeypatch.setattr(openai_client, "_disk_cache", SQLiteCache(path, 3600))
+
+    assert asyncio.run(openai_client.get_or_compute_analysis_async("Persistent post")) == first
+    assert restarted.calls == 0
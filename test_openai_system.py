@@ -4,7 +4,7 @@ Test script for OpenAI-based content analysis system
 """
 import asyncio
 import os
-from scoring_engine_openai import calculate_overall_score
+from scoring_engine_openai import calculate_overall_score, calculate_overall_score_batch
 
 async def test_system():
     """Test the OpenAI-based scoring system"""
@@ -20,27 +20,26 @@ async def test_system():
         "I personally believe that this topic requires careful consideration."
     ]
     
-    for i, text in enumerate(test_cases, 1):
-        print(f"\n📝 Test Case {i}: {text[:50]}...")
-        print("-" * 30)
-        
+    # Score every case with one batched analysis request; a failed batch falls back to one request per case
+    try:
+        results = await calculate_overall_score_batch(test_cases)
+    except Exception as e:
+        print(f"❌ Batch error: {e}")
+        results = [None] * len(test_cases)
+    
+    # One write per case instead of a print per line
+    for i, (text, result) in enumerate(zip(test_cases, results), 1):
+        lines = [f"\n📝 Test Case {i}: {text[:50]}...", "-" * 30]
         try:
-            overall_score, score_breakdown, recommendations = await calculate_overall_score(text)
-            
-            print(f"Overall Score: {overall_score}")
-            print(f"Sentiment: {score_breakdown['sentiment']['final_score']:.1f}")
-            print(f"Bias: {score_breakdown['bias']['final_score']:.1f}")
-            print(f"Readability: {score_breakdown['readability']['final_score']:.1f}")
-            print(f"Originality: {score_breakdown['originality']['final_score']:.1f}")
-            print(f"Plagiarism: {score_breakdown['plagiarism']['final_score']:.1f}")
-            print(f"Authenticity: {score_breakdown['authenticity']['final_score']:.1f}")
-            print(f"Length: {score_breakdown['length']['final_score']:.1f}")
-            
+            overall_score, score_breakdown, recommendations = result or await calculate_overall_score(text)
+            lines.append(f"Overall Score: {overall_score}")
+            lines.extend(f"{name.capitalize()}: {score_breakdown[name]['final_score']:.1f}"
+                         for name in ('sentiment', 'bias', 'readability', 'originality', 'plagiarism', 'authenticity', 'length'))
             if recommendations:
-                print(f"Recommendations: {recommendations[0]}")
-            
+                lines.append(f"Recommendations: {recommendations[0]}")
         except Exception as e:
-            print(f"❌ Error: {e}")
+            lines.append(f"❌ Error: {e}")
+        print("\n".join(lines))
     
     print("\n✅ Testing completed!")
 
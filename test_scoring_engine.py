@@ -0,0 +1,63 @@
+"""
+Tests for the readability and weighting helpers of the ASI:One scoring engine
+"""
+import numpy as np
+import pytest
+import scoring_engine
+from models import TextFeatures
+
+# Punctuation, "-le" endings, silent "e", the stripped suffixes, capitals and non-ASCII words
+CORPUS = (
+    "The little table, simple and stable, sat there. Make the cake! Be free; see? "
+    "Boxes jumped; singing kings were thinking. es ed ing e y rhythm "
+    "It's a well-known fact -- \"quoted\" (parenthesized) words... "
+    "Café naïve résumé Zürich coöperate Ægir İstanbul 日本語 emoji 🎉 "
+    "BEAUTIFUL Wonderful INTERESTING necessary queue aisle fire hire lyre"
+)
+
+
+def reference_syllables(features: TextFeatures) -> list:
+    return [scoring_engine.count_syllables(word) for word in features.words]
+
+
+@pytest.mark.parametrize("text", [CORPUS, " ".join([CORPUS] * 3)], ids=["per-word", "byte-level"])
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_word_syllables_match_count_syllables(monkeypatch, text, use_numba):
+    if use_numba and scoring_engine._syllable_counts_jit is None:
+        pytest.skip("numba not installed")
+    if not use_numba:
+        monkeypatch.setattr(scoring_engine, "_syllable_counts_jit", None)
+    features = TextFeatures.from_text(text)
+    assert (features.word_count >= scoring_engine.VECTORIZE_MIN_WORDS) == (len(text) > len(CORPUS))
+
+    assert scoring_engine.word_syllables(features).tolist() == reference_syllables(features)
+
+
+def test_byte_walk_matches_count_syllables_uncompiled():
+    features = TextFeatures.from_text(CORPUS)
+    buf = np.frombuffer(" ".join(features.lower.split()).encode(), dtype=np.uint8)
+
+    assert scoring_engine._syllable_counts_loop(buf).tolist() == reference_syllables(features)
+
+
+def baseline_weights(length_score: float):
+    """Weights and base weights as calculate_overall_score built them per call before the tiers were precomputed"""
+    if length_score < 20:
+        weights = {'sentiment': 0.05, 'bias': 0.10, 'readability': 0.05, 'originality': 0.10, 'authenticity': 0.10, 'length': 0.60}
+    elif length_score < 40:
+        weights = {'sentiment': 0.10, 'bias': 0.15, 'readability': 0.05, 'originality': 0.15, 'authenticity': 0.15, 'length': 0.40}
+    elif length_score < 60:
+        weights = {'sentiment': 0.12, 'bias': 0.18, 'readability': 0.08, 'originality': 0.22, 'authenticity': 0.20, 'length': 0.20}
+    else:
+        weights = {'sentiment': 0.15, 'bias': 0.20, 'readability': 0.10, 'originality': 0.30, 'authenticity': 0.15, 'length': 0.10}
+    total_weight = sum(weights.values())
+    if total_weight != 1.0:
+        weights = {key: value / total_weight for key, value in weights.items()}
+    base_weights = {key: weights[key] for key in ('sentiment', 'bias', 'readability', 'length')}
+    base_weight_sum = sum(base_weights.values())
+    return weights, {key: value / base_weight_sum for key, value in base_weights.items()}
+
+
+@pytest.mark.parametrize("length_score", [0.0, 19.99, 20.0, 39.99, 40.0, 59.99, 60.0, 100.0])
+def test_weight_tiers_match_the_per_call_weights(length_score):
+    assert scoring_engine._weights_for(length_score) == baseline_weights(length_score)